@@ -9,6 +9,8 @@ to measure the effect size of the relationship between text box size
 and response rates.
 """
 
+import sys
+
 import pandas as pd
 import numpy as np
 import scipy.stats as stats
@@ -51,10 +53,77 @@ def interpret_phi(phi_value):
         return "large"
 
 
-def perform_chi_square_with_phi(large_box, small_box, question_name):
-    """Perform chi-square test and calculate Phi coefficient.
+def chi_square_2x2(tables):
+    """Chi-square test of independence for 2x2 contingency tables.
+    
+    Closed-form equivalent of scipy.stats.chi2_contingency, including
+    Yates' continuity correction, for a single (2, 2) table or a stack
+    of tables with shape (k, 2, 2).
+    
+    Args:
+        tables: 2x2 table(s) of observed frequencies
+        
+    Returns:
+        Tuple of (chi2, p_value, expected)
+    """
+    tables = np.asarray(tables, dtype=np.float64)
+    a, b = tables[..., 0, 0], tables[..., 0, 1]
+    c, d = tables[..., 1, 0], tables[..., 1, 1]
+    
+    row_sums = tables.sum(axis=-1)
+    col_sums = tables.sum(axis=-2)
+    total_n = row_sums.sum(axis=-1)
+    expected = row_sums[..., :, None] * col_sums[..., None, :] / total_n[..., None, None]
+    if np.any(expected == 0):
+        raise ValueError("The table of expected frequencies has a zero element.")
+    
+    # Yates' correction: |ad - bc| is shrunk by N/2, but not below zero
+    deviation = np.maximum(np.abs(a * d - b * c) - total_n / 2, 0)
+    chi2 = total_n * deviation**2 / (row_sums.prod(axis=-1) * col_sums.prod(axis=-1))
+    p_value = stats.chi2.sf(chi2, 1)
+    
+    return chi2, p_value, expected
+
+
+def perform_chi_square_batch(tables):
+    """Perform chi-square tests and calculate Phi for many 2x2 tables at once.
+    
+    Args:
+        tables: Array of shape (k, 2, 2), each table being
+            [[large responses, large non-responses],
+             [small responses, small non-responses]]
+        
+    Returns:
+        Dictionary of length-k arrays: chi2, p_value, expected, phi, total_n,
+        and the response rates large_rate, small_rate and diff (in percent)
+    """
+    tables = np.asarray(tables)
+    chi2, p_value, expected = chi_square_2x2(tables)
+    row_sums = tables.sum(axis=2)
+    total_n = row_sums.sum(axis=1)
+    
+    # Response rate per text box size; 0% for a box with no observations
+    rates = np.divide(tables[:, :, 0] * 100, row_sums,
+                      out=np.zeros(row_sums.shape), where=row_sums > 0)
+    
+    return {
+        'chi2': chi2,
+        'p_value': p_value,
+        'expected': expected,
+        'phi': calculate_phi(chi2, total_n),
+        'total_n': total_n,
+        'large_rate': rates[:, 0],
+        'small_rate': rates[:, 1],
+        'diff': rates[:, 0] - rates[:, 1]
+    }
+
+
+def get_question_results(batch, index, large_box, small_box, question_name):
+    """Extract the results for one question from a batch of chi-square tests.
     
     Args:
+        batch: Dictionary returned by perform_chi_square_batch
+        index: Position of the question's table in the batch
         large_box: List of [responses, non_responses] for large text box
         small_box: List of [responses, non_responses] for small text box
         question_name: Name/description of the question being analyzed
@@ -62,24 +131,40 @@ def perform_chi_square_with_phi(large_box, small_box, question_name):
     Returns:
         Dictionary containing test results including Phi coefficient
     """
-    chi2, p_value, dof, expected = stats.chi2_contingency([large_box, small_box])
-    total_n = sum(large_box) + sum(small_box)
-    phi = calculate_phi(chi2, total_n)
+    phi = batch['phi'][index]
     
     return {
         'question': question_name,
-        'chi2': chi2,
-        'p_value': p_value,
-        'dof': dof,
-        'expected': expected,
+        'chi2': batch['chi2'][index],
+        'p_value': batch['p_value'][index],
+        'dof': 1,
+        'expected': batch['expected'][index],
         'phi': phi,
         'effect_size': interpret_phi(phi),
-        'total_n': total_n,
+        'total_n': int(batch['total_n'][index]),
         'large_box': large_box,
-        'small_box': small_box
+        'small_box': small_box,
+        'large_rate': batch['large_rate'][index],
+        'small_rate': batch['small_rate'][index],
+        'diff': batch['diff'][index]
     }
 
 
+def perform_chi_square_with_phi(large_box, small_box, question_name):
+    """Perform chi-square test and calculate Phi coefficient.
+    
+    Args:
+        large_box: List of [responses, non_responses] for large text box
+        small_box: List of [responses, non_responses] for small text box
+        question_name: Name/description of the question being analyzed
+        
+    Returns:
+        Dictionary containing test results including Phi coefficient
+    """
+    batch = perform_chi_square_batch([[large_box, small_box]])
+    return get_question_results(batch, 0, large_box, small_box, question_name)
+
+
 def print_test_results(results, alpha=0.05):
     """Print formatted chi-square test results with Phi coefficient.
     
@@ -87,44 +172,31 @@ def print_test_results(results, alpha=0.05):
         results: Dictionary containing test results
         alpha: Significance level (default 0.05)
     """
-    print("\n" + "="*70)
-    print(f"Chi-Square Test: {results['question']}")
-    print("="*70)
+    lines = []
+    lines.append("\n" + "="*70)
+    lines.append(f"Chi-Square Test: {results['question']}")
+    lines.append("="*70)
     
-    print(f"\nLarge text box: {results['large_box'][0]} responses, "
-          f"{results['large_box'][1]} non-responses")
-    print(f"Small text box: {results['small_box'][0]} responses, "
-          f"{results['small_box'][1]} non-responses")
-    print(f"Total sample size: {results['total_n']}")
+    lines.append(f"\nLarge text box: {results['large_box'][0]} responses, "
+                 f"{results['large_box'][1]} non-responses")
+    lines.append(f"Small text box: {results['small_box'][0]} responses, "
+                 f"{results['small_box'][1]} non-responses")
+    lines.append(f"Total sample size: {results['total_n']}")
     
-    print(f"\nChi-square statistic: {results['chi2']:.4f}")
-    print(f"p-value: {results['p_value']:.4f}")
-    print(f"Phi coefficient: {results['phi']:.4f}")
-    print(f"Effect size: {results['effect_size']}")
+    lines.append(f"\nChi-square statistic: {results['chi2']:.4f}")
+    lines.append(f"p-value: {results['p_value']:.4f}")
+    lines.append(f"Phi coefficient: {results['phi']:.4f}")
+    lines.append(f"Effect size: {results['effect_size']}")
     
     if results['p_value'] < alpha:
-        print(f"\n✓ Result: Statistically significant (p < {alpha})")
-        print(f"  The relationship between text box size and response rate is")
-        print(f"  significant with a {results['effect_size']} effect size.")
+        lines.append(f"\n✓ Result: Statistically significant (p < {alpha})")
+        lines.append(f"  The relationship between text box size and response rate is")
+        lines.append(f"  significant with a {results['effect_size']} effect size.")
     else:
-        print(f"\n✗ Result: Not statistically significant (p >= {alpha})")
-        print("  Insufficient evidence to support the hypothesis.")
-
-
-def calculate_response_rate(responses, non_responses):
-    """Calculate response rate percentage.
+        lines.append(f"\n✗ Result: Not statistically significant (p >= {alpha})")
+        lines.append("  Insufficient evidence to support the hypothesis.")
     
-    Args:
-        responses: Number of responses
-        non_responses: Number of non-responses
-        
-    Returns:
-        Response rate as percentage
-    """
-    total = responses + non_responses
-    if total == 0:
-        return 0.0
-    return (responses / total) * 100
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def print_summary_table(all_results):
@@ -133,55 +205,53 @@ def print_summary_table(all_results):
     Args:
         all_results: List of result dictionaries
     """
-    print("\n" + "="*80)
-    print("SUMMARY TABLE: Chi-Square Tests with Effect Sizes")
-    print("="*80)
-    print(f"\n{'Question':<35} {'Chi²':<10} {'p-value':<10} "
-          f"{'Phi':<10} {'Effect':<15}")
-    print("-"*80)
+    lines = []
+    lines.append("\n" + "="*80)
+    lines.append("SUMMARY TABLE: Chi-Square Tests with Effect Sizes")
+    lines.append("="*80)
+    lines.append(f"\n{'Question':<35} {'Chi²':<10} {'p-value':<10} "
+                 f"{'Phi':<10} {'Effect':<15}")
+    lines.append("-"*80)
     
     for result in all_results:
         significant = "Yes**" if result['p_value'] < 0.05 else "No"
         question_short = result['question'][:33]
-        print(f"{question_short:<35} {result['chi2']:<10.4f} "
-              f"{result['p_value']:<10.4f} {result['phi']:<10.4f} "
-              f"{result['effect_size']:<15}")
+        lines.append(f"{question_short:<35} {result['chi2']:<10.4f} "
+                     f"{result['p_value']:<10.4f} {result['phi']:<10.4f} "
+                     f"{result['effect_size']:<15}")
     
-    print("\n** Statistically significant at α = 0.05")
+    lines.append("\n** Statistically significant at α = 0.05")
     
     # Response rate comparison
-    print("\n" + "="*80)
-    print("Response Rate Comparison")
-    print("="*80)
-    print(f"\n{'Question':<35} {'Large Box':<12} {'Small Box':<12} "
-          f"{'Difference':<12}")
-    print("-"*80)
+    lines.append("\n" + "="*80)
+    lines.append("Response Rate Comparison")
+    lines.append("="*80)
+    lines.append(f"\n{'Question':<35} {'Large Box':<12} {'Small Box':<12} "
+                 f"{'Difference':<12}")
+    lines.append("-"*80)
     
     for result in all_results:
-        large_rate = calculate_response_rate(
-            result['large_box'][0], result['large_box'][1]
-        )
-        small_rate = calculate_response_rate(
-            result['small_box'][0], result['small_box'][1]
-        )
-        diff = large_rate - small_rate
-        
         question_short = result['question'][:33]
-        print(f"{question_short:<35} {large_rate:>10.1f}% "
-              f"{small_rate:>10.1f}% {diff:>+10.1f}%")
+        lines.append(f"{question_short:<35} {result['large_rate']:>10.1f}% "
+                     f"{result['small_rate']:>10.1f}% {result['diff']:>+10.1f}%")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def print_effect_size_guide():
     """Print guide for interpreting Phi coefficient values."""
-    print("\n" + "="*80)
-    print("Effect Size Interpretation Guide (Phi Coefficient)")
-    print("="*80)
-    print("\n  < 0.10  : Negligible effect")
-    print("  0.10-0.29 : Small effect")
-    print("  0.30-0.49 : Medium effect")
-    print("  ≥ 0.50  : Large effect")
-    print("\nThe Phi coefficient measures the strength of association between")
-    print("text box size and response rates, independent of sample size.")
+    lines = []
+    lines.append("\n" + "="*80)
+    lines.append("Effect Size Interpretation Guide (Phi Coefficient)")
+    lines.append("="*80)
+    lines.append("\n  < 0.10  : Negligible effect")
+    lines.append("  0.10-0.29 : Small effect")
+    lines.append("  0.30-0.49 : Medium effect")
+    lines.append("  ≥ 0.50  : Large effect")
+    lines.append("\nThe Phi coefficient measures the strength of association between")
+    lines.append("text box size and response rates, independent of sample size.")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -193,7 +263,8 @@ def main():
     
     # Load data
     print("\nLoading data from 'data/input/matrix-recoded.csv'...")
-    matrix = pd.read_csv("../data/input/matrix-recoded.csv")
+    # Only the record count is reported, so a single column is enough
+    matrix = pd.read_csv("../data/input/matrix-recoded.csv", usecols=['id'])
     print(f"Data loaded: {len(matrix)} records")
     
     questions_data = [
@@ -204,10 +275,14 @@ def main():
     ]
     
     # Perform chi-square tests with Phi calculation
+    tables = np.array([[large_box, small_box]
+                       for large_box, small_box, _ in questions_data])
+    batch = perform_chi_square_batch(tables)
+    
     all_results = []
     
-    for large_box, small_box, question_name in questions_data:
-        results = perform_chi_square_with_phi(large_box, small_box, question_name)
+    for i, (large_box, small_box, question_name) in enumerate(questions_data):
+        results = get_question_results(batch, i, large_box, small_box, question_name)
         all_results.append(results)
         print_test_results(results)
     
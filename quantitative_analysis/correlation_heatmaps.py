@@ -8,9 +8,32 @@ for different survey format configurations.
 import numpy as np
 import pandas as pd
 import seaborn as sns
+from joblib import Parallel, delayed, effective_n_jobs
 from matplotlib import pyplot as plt
+from numba import config, njit, prange, set_num_threads
 from scipy import stats
 
+QUESTION_COLS = ['g01', 'g02', 'g03', 'g04', 'g05', 'g06',
+                 'g07', 'g08', 'g09', 'g10', 'g11', 'g12']
+
+# Question order shown to the Order B groups (formats 2 and 4), and the
+# positions of those questions in QUESTION_COLS
+ORDER_B_COLS = ['g02', 'g11', 'g04', 'g01', 'g05', 'g09',
+                'g07', 'g03', 'g08', 'g10', 'g06', 'g12']
+ORDER_B_IDX = np.array([QUESTION_COLS.index(col) for col in ORDER_B_COLS])
+
+# Columns read from the input file and their storage types
+INPUT_DTYPES = {
+    'uloga': 'int8',
+    'cesto': 'int8',
+    'formatUp': 'int8',
+    'hidden': 'int16',
+    **{col: 'float32' for col in QUESTION_COLS}
+}
+
+# Fraction of each format group drawn (without replacement) per bootstrap sample
+SAMPLE_FRAC = 0.6
+
 
 def filter_data(matrix):
     """Load survey data and filter for students who regularly visit."""
@@ -21,83 +44,280 @@ def filter_data(matrix):
 
 
 def prepare_format_groups(matrix):
-    """Split data into 4 format groups based on formatUp and hidden values."""
-    columns = ['formatUp', 'hidden', 'g01', 'g02', 'g03', 'g04', 'g05', 'g06',
-               'g07', 'g08', 'g09', 'g10', 'g11', 'g12']
-    grid = matrix[columns]
+    """Split data into 4 format groups based on formatUp and hidden values.
+
+    Returns:
+        list: One float64 array of g01-g12 answers per format group
+    """
+    formats = matrix['formatUp'].to_numpy()
+    hidden = matrix['hidden'].to_numpy()
+    answers = matrix[QUESTION_COLS].to_numpy(dtype=np.float64)
+    order_a = hidden < 51
+    order_b = hidden > 50
     
     forms = [
-        grid[(grid['formatUp'] == 1) & (grid['hidden'] < 51)].copy(),
-        grid[(grid['formatUp'] == 1) & (grid['hidden'] > 50)].copy(),
-        grid[(grid['formatUp'] == 2) & (grid['hidden'] < 51)].copy(),
-        grid[(grid['formatUp'] == 2) & (grid['hidden'] > 50)].copy()
+        answers[(formats == 1) & order_a],
+        answers[(formats == 1) & order_b],
+        answers[(formats == 2) & order_a],
+        answers[(formats == 2) & order_b]
     ]
     
-    # Drop grouping columns
-    for form in forms:
-        form.drop(["formatUp", "hidden"], axis=1, inplace=True)
-    
     return forms
 
 
-def get_upper_triangle(df):
-    """Extract upper triangle values from a correlation matrix."""
-    if not isinstance(df, np.ndarray):
-        if isinstance(df, pd.DataFrame):
-            df = df.values
+def rank_columns(form):
+    """Rank each column of a form, leaving missing values as NaN."""
+    return stats.rankdata(form, axis=0, nan_policy='omit')
+
+
+def sample_rows(n_rows, n_iterations, rng):
+    """Draw row indices for all bootstrap samples at once.
+
+    Each row of the result holds SAMPLE_FRAC of the rows drawn without
+    replacement, like DataFrame.sample(frac=SAMPLE_FRAC).
+    """
+    size = round(SAMPLE_FRAC * n_rows)
+    rows = np.tile(np.arange(n_rows), (n_iterations, 1))
+    return rng.permuted(rows, axis=1)[:, :size]
+
+
+@njit(cache=True, nogil=True)
+def _upper_corr(X, rows):
+    """Upper triangle of the Pearson matrix of X[rows], row-major.
+
+    Missing values are handled pairwise, as in DataFrame.corr.
+    """
+    p = X.shape[1]
+    out = np.empty(p * (p - 1) // 2)
+    k = 0
+    for i in range(p):
+        for j in range(i + 1, p):
+            n = 0
+            sum_x = 0.0
+            sum_y = 0.0
+            sum_xx = 0.0
+            sum_yy = 0.0
+            sum_xy = 0.0
+            for r in rows:
+                x = X[r, i]
+                y = X[r, j]
+                if np.isnan(x) or np.isnan(y):
+                    continue
+                n += 1
+                sum_x += x
+                sum_y += y
+                sum_xx += x * x
+                sum_yy += y * y
+                sum_xy += x * y
+            cov = n * sum_xy - sum_x * sum_y
+            var = (n * sum_xx - sum_x * sum_x) * (n * sum_yy - sum_y * sum_y)
+            out[k] = cov / np.sqrt(var) if var > 0 else np.nan
+            k += 1
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _tied_pairs(values):
+    """Number of tied pairs in a sorted vector."""
+    pairs = 0
+    run = 1
+    for k in range(1, values.shape[0]):
+        if values[k] == values[k - 1]:
+            run += 1
+        else:
+            pairs += run * (run - 1) // 2
+            run = 1
+    return pairs + run * (run - 1) // 2
+
+
+@njit(cache=True, nogil=True)
+def _merge_sort_inversions(values):
+    """Merge-sort a vector; return the sorted copy and its inversion count."""
+    n = values.shape[0]
+    values = values.copy()
+    buffer = np.empty_like(values)
+    inversions = 0
+    width = 1
+    while width < n:
+        for start in range(0, n, 2 * width):
+            mid = min(start + width, n)
+            end = min(start + 2 * width, n)
+            i, j, k = start, mid, start
+            while i < mid and j < end:
+                if values[j] < values[i]:
+                    buffer[k] = values[j]
+                    inversions += mid - i
+                    j += 1
+                else:
+                    buffer[k] = values[i]
+                    i += 1
+                k += 1
+            while i < mid:
+                buffer[k] = values[i]
+                i += 1
+                k += 1
+            while j < end:
+                buffer[k] = values[j]
+                j += 1
+                k += 1
+        values, buffer = buffer, values
+        width *= 2
+    return values, inversions
+
+
+@njit(cache=True, nogil=True)
+def _kendall_tau(x, y):
+    """Kendall tau-b of two vectors; NaN if either contains NaN.
+
+    Uses Knight's O(n log n) algorithm: sort by (x, y), then count the
+    discordant pairs as the inversions left in y.
+    """
+    n = x.shape[0]
+    for k in range(n):
+        if np.isnan(x[k]) or np.isnan(y[k]):
+            return np.nan
+    
+    order = np.argsort(y, kind='mergesort')
+    order = order[np.argsort(x[order], kind='mergesort')]
+    x_sorted = x[order]
+    y_by_x = y[order]
+    
+    ties_x = _tied_pairs(x_sorted)
+    ties_xy = 0
+    run = 1
+    for k in range(1, n):
+        if x_sorted[k] == x_sorted[k - 1] and y_by_x[k] == y_by_x[k - 1]:
+            run += 1
         else:
-            raise TypeError('Must be np.ndarray or pd.DataFrame')
+            ties_xy += run * (run - 1) // 2
+            run = 1
+    ties_xy += run * (run - 1) // 2
     
-    mask = np.triu_indices(df.shape[0], k=1)
-    return df[mask]
+    y_sorted, discordant = _merge_sort_inversions(y_by_x)
+    ties_y = _tied_pairs(y_sorted)
+    
+    total = n * (n - 1) // 2
+    untied_x = total - ties_x
+    untied_y = total - ties_y
+    if untied_x == 0 or untied_y == 0:
+        return np.nan
+    concordance = total - ties_x - ties_y + ties_xy - 2 * discordant
+    return concordance / np.sqrt(untied_x * untied_y)
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def boot_kernel(ranks_1, ranks_2, idx_1, idx_2, out):
+    """Fill out[t] with the tau between the sample-t rank-Pearson matrices.
+
+    The ranks are the whole-form ranks, gathered for the sample rows and
+    not re-ranked, so this approximates a per-sample Spearman matrix.
+    """
+    for t in prange(out.shape[0]):
+        out[t] = _kendall_tau(_upper_corr(ranks_1, idx_1[t]),
+                              _upper_corr(ranks_2, idx_2[t]))
+
+
+def bootstrap_correlation(ranks_1, ranks_2, rng, n_iterations=1000):
+    """Calculate correlation between two matrices using bootstrap sampling.
+
+    Every iteration draws a subsample of each matrix, computes the
+    Pearson correlation matrices of its whole-form ranks and compares the
+    upper triangles with Kendall's tau. The ranks are not recomputed
+    within the subsample (or within the pairwise-complete rows), so the
+    matrices approximate, but do not equal, per-sample Spearman matrices.
+    Iterations run in parallel in a compiled kernel.
+
+    Args:
+        ranks_1, ranks_2: Column ranks of the two forms (see rank_columns)
+
+    Returns:
+        Array of n_iterations tau values
+    """
+    idx_1 = sample_rows(len(ranks_1), n_iterations, rng)
+    idx_2 = sample_rows(len(ranks_2), n_iterations, rng)
+    
+    bootr = np.empty(n_iterations)
+    boot_kernel(ranks_1, ranks_2, idx_1, idx_2, bootr)
+    return bootr
+
 
+def _pair_bootstrap(ranks_1, ranks_2, n_iterations, rng, n_threads):
+    """Bootstrap one format pair and summarise it.
 
-def bootstrap_correlation(mat1, mat2):
-    """Calculate correlation between two matrices using bootstrap sampling."""
-    df_1 = mat1.sample(frac=0.6)
-    df_2 = mat2.sample(frac=0.6)
-    corr_m1 = df_1.corr(method='kendall')
-    corr_m2 = df_2.corr(method='kendall')
-    res = stats.kendalltau(get_upper_triangle(corr_m1), get_upper_triangle(corr_m2))
-    return res.statistic
+    The compiled kernel uses at most n_threads threads (the limit applies
+    to the calling thread only).
 
+    Returns:
+        tuple: (CI 2.5%, mean, CI 97.5%, Monte Carlo standard error of the mean)
+    """
+    set_num_threads(n_threads)
+    bootr = bootstrap_correlation(ranks_1, ranks_2, rng, n_iterations)
+    ci_low, ci_high = np.percentile(bootr, [2.5, 97.5])
+    std_error = np.std(bootr) / np.sqrt(n_iterations)
+    return ci_low, np.mean(bootr), ci_high, std_error
 
-def run_bootstrap_analysis(forms, n_iterations=1000):
-    """Run bootstrap analysis for all format combinations."""
+
+def run_bootstrap_analysis(forms, n_iterations=1000, seed=0, n_jobs=-1):
+    """Run bootstrap analysis for all format combinations.
+
+    Format pairs are independent, so each pair is dispatched to a separate
+    thread; the compiled kernels release the GIL, so the pairs run
+    concurrently without spawning processes or pickling the ranks. The
+    Numba threads are split between the concurrent pairs so the CPU is
+    not oversubscribed. Running more than one pair at a time needs a
+    thread-safe Numba threading layer (TBB or OpenMP).
+
+    All random streams are spawned from a single PCG64 generator seeded
+    with `seed`. Forms are ranked once up front and the ranks are shared
+    by every pair and iteration.
+    """
     print("\n#6 - Bootstrap Analysis")
-    print("Format pairs: CI 2.5%, Mean, CI 97.5%")
-    
-    for a in range(4):
-        for b in range(a, 4):
-            # First bootstrap run
-            bootr = [bootstrap_correlation(forms[a], forms[b]) 
-                     for _ in range(n_iterations)]
-            
-            print(f"{a} {b} "
-                  f"{np.percentile(bootr, 2.5):.2f} "
-                  f"{np.mean(bootr):.2f} "
-                  f"{np.percentile(bootr, 97.5):.2f}")
-            
-            # Second bootstrap run
-            bootr = [bootstrap_correlation(forms[a], forms[b]) 
-                     for _ in range(n_iterations)]
-            
-            print(f"{a} {b} "
-                  f"{np.percentile(bootr, 2.5):.2f} "
-                  f"{np.mean(bootr):.2f} "
-                  f"{np.percentile(bootr, 97.5):.2f}")
-            print("***************")
+    print("Statistic: Kendall's tau between sample correlation matrices, "
+          "approximated as Pearson on whole-form ranks "
+          "(not per-sample Kendall matrices)")
+    print("Format pairs: CI 2.5%, Mean, CI 97.5%, SE of mean")
+    
+    ranks = [rank_columns(form) for form in forms]
+    pairs = [(a, b) for a in range(4) for b in range(a, 4)]
+    rng = np.random.default_rng(seed)
+    streams = rng.spawn(len(pairs))
+    
+    n_workers = min(effective_n_jobs(n_jobs), len(pairs))
+    n_threads = max(1, config.NUMBA_NUM_THREADS // n_workers)
+    if n_workers > 1:
+        # boot_kernel is launched from several threads at once
+        config.THREADING_LAYER = 'threadsafe'
+    
+    results = Parallel(n_jobs=n_workers, backend='threading')(
+        delayed(_pair_bootstrap)(ranks[a], ranks[b], n_iterations, stream,
+                                 n_threads)
+        for (a, b), stream in zip(pairs, streams)
+    )
+    
+    for (a, b), (ci_low, mean, ci_high, std_error) in zip(pairs, results):
+        print(f"{a} {b} "
+              f"{ci_low:.2f} "
+              f"{mean:.2f} "
+              f"{ci_high:.2f} "
+              f"{std_error:.4f}")
+
+
+def spearman_corr(form):
+    """Spearman correlation matrix of a form, labelled with the question names.
+
+    Pairs of questions with missing answers use the rows where both are
+    answered.
+    """
+    return pd.DataFrame(form, columns=QUESTION_COLS).corr(method='spearman')
 
 
 def calculate_correlations(forms):
     """Calculate Spearman correlations for each format."""
-    correlations = [form.corr(method='spearman') for form in forms]
+    correlations = [spearman_corr(form) for form in forms]
     
     # Reorder columns for formats 2 and 4
-    column_order = ['g02', 'g11', 'g04', 'g01', 'g05', 'g09', 
-                    'g07', 'g03', 'g08', 'g10', 'g06', 'g12']
-    corr_m2_ordered = forms[1][column_order].corr(method='spearman')
-    corr_m4_ordered = forms[3][column_order].corr(method='spearman')
+    corr_m2_ordered = correlations[1].iloc[ORDER_B_IDX, ORDER_B_IDX]
+    corr_m4_ordered = correlations[3].iloc[ORDER_B_IDX, ORDER_B_IDX]
     
     return correlations, corr_m2_ordered, corr_m4_ordered
 
@@ -146,7 +366,8 @@ def main():
     
     # Load data
     print("\nLoading data from 'data/input/matrix-final.csv'...")
-    filtered_matrix = pd.read_csv("../data/input/matrix-final.csv")
+    filtered_matrix = pd.read_csv("../data/input/matrix-final.csv",
+                                  usecols=list(INPUT_DTYPES), dtype=INPUT_DTYPES)
     print(f"Data loaded: {len(filtered_matrix)} records")
     
     # Filter and prepare data
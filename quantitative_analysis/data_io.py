@@ -0,0 +1,122 @@
+"""
+Shared loading and filtering of the survey matrix.
+
+The CSV export is parsed once and cached next to it as a Parquet file;
+later loads read only the requested columns from the cache.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "input"
+MATRIX_CSV = DATA_DIR / "matrix-final.csv"
+MATRIX_PARQUET = MATRIX_CSV.with_suffix(".parquet")
+
+STUDENT_ROLE_CODE = 2
+FREQUENT_VISITOR_THRESHOLD = 1
+
+ITEM_COLS = [f"g{i:02d}" for i in range(1, 14)]
+TEXT_COLS = ['txt01', 'txt02', 'txt03', 'txt01mali', 'txt02mali', 'txt03mali']
+
+# Compact storage types: small-range codes, Likert items 1-5 (which may be
+# missing, hence float32) and Arrow-backed free-text answers
+MATRIX_DTYPES = {
+    'uloga': 'uint8',
+    'cesto': 'uint8',
+    'formatUp': 'uint8',
+    'hidden': 'uint16',
+    **{col: 'float32' for col in ITEM_COLS},
+    **{col: 'string[pyarrow]' for col in TEXT_COLS}
+}
+
+
+def reduce_memory_usage(matrix):
+    """
+    Downcast integer columns to the smallest type that holds their range.
+
+    Float columns are left alone, since float32 could change their values.
+
+    Args:
+        matrix: DataFrame to downcast
+
+    Returns:
+        DataFrame: Downcast copy of the data
+    """
+    matrix = matrix.copy()
+    for col in matrix.select_dtypes(include='integer').columns:
+        downcast = 'unsigned' if matrix[col].min() >= 0 else 'integer'
+        matrix[col] = pd.to_numeric(matrix[col], downcast=downcast)
+    return matrix
+
+
+def _write_cache(matrix):
+    """
+    Write the Parquet cache atomically, ignoring failures.
+
+    The file is written under a temporary name and renamed into place, so
+    concurrent loads never see a partially written cache.
+
+    Args:
+        matrix: DataFrame to cache
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=MATRIX_PARQUET.parent, suffix=".parquet.tmp"
+        )
+        os.close(fd)
+        matrix.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, MATRIX_PARQUET)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_matrix(columns=None):
+    """
+    Load the survey matrix, using the Parquet cache when it is up to date.
+
+    The cache is (re)built from the CSV when it is missing or older than
+    the CSV. Columns are stored with compact dtypes (see MATRIX_DTYPES).
+    If the cache cannot be written (e.g. a read-only checkout), the
+    parsed CSV is used as is.
+
+    Args:
+        columns: Columns to load (default: all columns)
+
+    Returns:
+        DataFrame: Survey data
+    """
+    cache_is_stale = (
+        not MATRIX_PARQUET.exists()
+        or MATRIX_PARQUET.stat().st_mtime < MATRIX_CSV.stat().st_mtime
+    )
+
+    if cache_is_stale:
+        matrix = reduce_memory_usage(pd.read_csv(MATRIX_CSV, dtype=MATRIX_DTYPES))
+        _write_cache(matrix)
+        return matrix if columns is None else matrix[columns]
+
+    matrix = pd.read_parquet(MATRIX_PARQUET, engine="pyarrow", columns=columns)
+    # Parquet metadata restores plain "string"; keep the Arrow-backed storage
+    text_cols = [col for col in TEXT_COLS if col in matrix.columns]
+    return matrix.astype({col: MATRIX_DTYPES[col] for col in text_cols})
+
+
+def filter_frequent_students(matrix):
+    """
+    Keep only students who regularly visit the website.
+
+    Args:
+        matrix: DataFrame with survey data
+
+    Returns:
+        DataFrame: Rows with uloga == 2 (student) and cesto > 1
+    """
+    return matrix[
+        (matrix['uloga'] == STUDENT_ROLE_CODE) &
+        (matrix['cesto'] > FREQUENT_VISITOR_THRESHOLD)
+    ]
@@ -12,22 +12,32 @@ Analysis includes:
 - Factor loadings export
 """
 
-import csv
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
-from factor_analyzer import (
-    FactorAnalyzer,
-    calculate_bartlett_sphericity,
-    calculate_kmo
-)
+from numba import njit
+from scipy import stats
+
+# Imported from the package, or run directly as a script
+if __package__:
+    from quantitative_analysis.data_io import (
+        MATRIX_CSV,
+        STUDENT_ROLE_CODE,
+        filter_frequent_students,
+        load_matrix
+    )
+    from quantitative_analysis.plotting import draw_heatmap
+else:
+    from data_io import (
+        MATRIX_CSV,
+        STUDENT_ROLE_CODE,
+        filter_frequent_students,
+        load_matrix
+    )
+    from plotting import draw_heatmap
 
 # Constants
-DATA_FILEPATH = "../data/input/matrix-final.csv"
 OUTPUT_FILEPATH = "data/output/loadings{}.csv"
-STUDENT_ROLE_CODE = 2
-FREQUENT_VISITOR_THRESHOLD = 1
 HIDDEN_THRESHOLD = 50
 NUM_FACTORS = 3
 NUM_GROUPS = 4
@@ -38,6 +48,9 @@ QUESTION_COLS = [
     'g07', 'g08', 'g09', 'g10', 'g11', 'g12'
 ]
 
+# Columns loaded from the survey matrix
+INPUT_COLS = ['uloga', 'cesto', 'formatUp', 'hidden'] + QUESTION_COLS
+
 # Group labels for visualization
 GROUP_LABELS = [
     'Single Page - Order A',
@@ -65,13 +78,10 @@ def filter_data(matrix):
     """
     
     initial_count = len(matrix)
+    students_count = int((matrix['uloga'] == STUDENT_ROLE_CODE).sum())
     
-    # Filter for students only
-    matrix = matrix[matrix['uloga'] == STUDENT_ROLE_CODE]
-    students_count = len(matrix)
-    
-    # Filter for frequent visitors
-    matrix = matrix[matrix['cesto'] > FREQUENT_VISITOR_THRESHOLD]
+    # Filter for students who frequently visit
+    matrix = filter_frequent_students(matrix)
     final_count = len(matrix)
     
     print(f"Initial records: {initial_count}")
@@ -99,30 +109,64 @@ def prepare_format_groups(matrix):
         matrix: Filtered DataFrame
         
     Returns:
-        list: List of 4 DataFrames, one for each group
+        tuple: (items, group_indices) with the question answers of all
+            rows as one float32 array and a list of 4 row index arrays,
+            one for each group
     """
     print(f"\n{COLOR_CYAN}Preparing format groups...{COLOR_RESET}")
     
     # Select relevant columns
     cols = ['formatUp', 'hidden'] + QUESTION_COLS
-    grid = matrix[cols].copy()
+    grid = matrix[cols]
+    
+    # One contiguous block of answers; groups are row indices into it
+    items = grid[QUESTION_COLS].to_numpy(dtype=np.float32)
+    
+    # Composite group key: formatUp * 2 + (Order B), i.e. codes 2, 3, 4, 5
+    # for the 4 groups
+    key = (grid['formatUp'].to_numpy().astype(np.uint8) * 2 +
+           (grid['hidden'].to_numpy() > HIDDEN_THRESHOLD).astype(np.uint8))
+    group_indices = [np.flatnonzero(key == code) for code in (2, 3, 4, 5)]
+    
+    for i, idx in enumerate(group_indices):
+        print(f"  Group {i + 1} ({GROUP_LABELS[i]}): {len(idx)} records")
+    
+    return items, group_indices
+
+
+def calculate_adequacy_statistics(X):
+    """
+    Calculate Bartlett's sphericity test and the overall KMO measure.
+    
+    Both statistics are derived from a single correlation matrix and its
+    inverse.
+    
+    Args:
+        X: Complete-case data array (observations x items)
+        
+    Returns:
+        tuple: (chi_square, p_value, kmo_model)
+    """
+    n, p = X.shape
+    corr = np.corrcoef(X, rowvar=False)
+    
+    # Bartlett: -(n - 1 - (2p + 5) / 6) * ln|R|, with p(p - 1) / 2 df
+    _, logdet = np.linalg.slogdet(corr)
+    chi_square = -(n - 1 - (2 * p + 5) / 6) * logdet
+    p_value = stats.chi2.sf(chi_square, p * (p - 1) / 2)
     
-    # Create 4 groups
-    groups = []
-    conditions = [
-        (grid['formatUp'] == 1) & (grid['hidden'] < HIDDEN_THRESHOLD + 1),
-        (grid['formatUp'] == 1) & (grid['hidden'] > HIDDEN_THRESHOLD),
-        (grid['formatUp'] == 2) & (grid['hidden'] < HIDDEN_THRESHOLD + 1),
-        (grid['formatUp'] == 2) & (grid['hidden'] > HIDDEN_THRESHOLD)
-    ]
+    # KMO: squared correlations vs. squared partial correlations,
+    # off-diagonal elements only
+    corr_inv = np.linalg.inv(corr)
+    scale = 1 / np.sqrt(np.diag(corr_inv))
+    partial_corr = -corr_inv * np.outer(scale, scale)
     
-    for i, condition in enumerate(conditions):
-        group = grid[condition].copy()
-        group.drop(['formatUp', 'hidden'], axis=1, inplace=True)
-        groups.append(group)
-        print(f"  Group {i + 1} ({GROUP_LABELS[i]}): {len(group)} records")
+    off_diagonal = ~np.eye(p, dtype=bool)
+    corr_sum = (corr[off_diagonal] ** 2).sum()
+    partial_corr_sum = (partial_corr[off_diagonal] ** 2).sum()
+    kmo_model = corr_sum / (corr_sum + partial_corr_sum)
     
-    return groups
+    return chi_square, p_value, kmo_model
 
 
 def perform_adequacy_tests(matrix):
@@ -138,15 +182,14 @@ def perform_adequacy_tests(matrix):
     print(f"\n{COLOR_CYAN}Performing adequacy tests...{COLOR_RESET}")
     
     # Select question columns and remove missing values
-    cols =  QUESTION_COLS
-    grid = matrix[cols].copy()
-    faktor = grid.dropna()
-
+    faktor = matrix[QUESTION_COLS].dropna()
+    X = np.ascontiguousarray(faktor.to_numpy(dtype=np.float64))
     
     print(f"Complete cases for analysis: {len(faktor)}")
     
+    chi_square, p_value, kmo_model = calculate_adequacy_statistics(X)
+    
     # Bartlett's test of sphericity
-    chi_square, p_value = calculate_bartlett_sphericity(faktor)
     print(f"\n{COLOR_GREEN}Bartlett's Test of Sphericity:{COLOR_RESET}")
     print(f"  Chi-square: {chi_square:.2f}")
     print(f"  p-value: {p_value:.4e}")
@@ -157,7 +200,6 @@ def perform_adequacy_tests(matrix):
         print(f"  {COLOR_YELLOW}⚠ Warning: p-value > 0.001{COLOR_RESET}")
     
     # Kaiser-Meyer-Olkin (KMO) test
-    kmo_all, kmo_model = calculate_kmo(faktor)
     print(f"\n{COLOR_GREEN}Kaiser-Meyer-Olkin (KMO) Test:{COLOR_RESET}")
     print(f"  Overall KMO: {kmo_model:.3f}")
     
@@ -179,34 +221,163 @@ def perform_adequacy_tests(matrix):
     return chi_square, p_value, kmo_model
 
 
-def perform_factor_analysis(groups):
+def principal_components(corr, n_factors):
+    """
+    Extract unrotated principal component loadings from correlation matrices.
+    
+    Args:
+        corr: Correlation matrix (items x items), or a stack of them
+            with shape (groups x items x items)
+        n_factors: Number of components to keep
+        
+    Returns:
+        tuple: (loadings, eigenvalues) with loadings of shape
+            (..., items x n_factors) and all eigenvalues in descending order
+    """
+    # Symmetric eigensolver, batched over a stack; ascending order
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    eigenvalues, eigenvectors = eigenvalues[..., ::-1], eigenvectors[..., ::-1]
+    
+    loadings = (eigenvectors[..., :n_factors] *
+                np.sqrt(eigenvalues[..., None, :n_factors]))
+    return loadings, eigenvalues
+
+
+@njit(cache=True, nogil=True)
+def _varimax_12x3(X, tol, max_iter):
+    """
+    BSV varimax iterations specialized for 12 items and 3 factors.
+    
+    Same iteration as varimax_bsv, with the column sums of squares, the
+    3x3 gradient and the rotated loadings written as fixed-size loops
+    into preallocated buffers.
+    
+    Args:
+        X: (Normalized) unrotated loadings, shape (12, 3)
+        tol: Relative convergence tolerance
+        max_iter: Maximum number of iterations
+        
+    Returns:
+        ndarray: Rotated loadings
+    """
+    assert X.shape[0] == 12 and X.shape[1] == 3
+    
+    B = X.copy()
+    G = np.empty((3, 3))
+    sums = np.empty(3)
+    S = 0.0
+    for _ in range(max_iter):
+        for c in range(3):
+            sums[c] = 0.0
+            for i in range(12):
+                sums[c] += B[i, c] * B[i, c]
+        
+        # G = X^T (12 * B^3 - B * sums)
+        G[:, :] = 0.0
+        for i in range(12):
+            for c in range(3):
+                b = B[i, c]
+                d = 12.0 * b * b * b - b * sums[c]
+                for r in range(3):
+                    G[r, c] += X[i, r] * d
+        
+        U, sig, Vt = np.linalg.svd(G, full_matrices=False)
+        T = U @ Vt
+        for i in range(12):
+            for c in range(3):
+                B[i, c] = X[i, 0] * T[0, c] + X[i, 1] * T[1, c] + X[i, 2] * T[2, c]
+        
+        S1 = sig[0] + sig[1] + sig[2]
+        if abs(S1 - S) / S1 < tol:
+            break
+        S = S1
+    
+    return B
+
+
+@njit(cache=True, nogil=True)
+def varimax_bsv(A, normalize=True, tol=1e-12, max_iter=1000):
+    """
+    Varimax rotation using the basic singular value (BSV) algorithm.
+    
+    Each iteration takes the SVD of the varimax gradient and sets the
+    rotation to its orthogonal polar factor, until the sum of singular
+    values stops increasing. Compiled with Numba, so the whole iteration
+    runs as native code; the 12 item x 3 factor case of this analysis
+    uses the fixed-size _varimax_12x3.
+    
+    Args:
+        A: Unrotated loadings (items x factors)
+        normalize: Apply Kaiser normalization (rows scaled to unit length)
+        tol: Relative convergence tolerance
+        max_iter: Maximum number of iterations
+        
+    Returns:
+        ndarray: Rotated loadings
+    """
+    n_rows, n_cols = A.shape
+    if n_cols < 2:
+        return A.copy()
+    
+    row_norms = np.ones((n_rows, 1))
+    if normalize:
+        row_norms[:, 0] = np.sqrt((A * A).sum(axis=1))
+    X = np.ascontiguousarray(A / row_norms)
+    if n_rows == 12 and n_cols == 3:
+        return _varimax_12x3(X, tol, max_iter) * row_norms
+    Xt = np.ascontiguousarray(X.T)
+    
+    B = X.copy()
+    S = 0.0
+    for _ in range(max_iter):
+        U, sig, Vt = np.linalg.svd(
+            Xt @ (n_rows * B ** 3 - B * (B * B).sum(axis=0))
+        )
+        B = X @ (U @ Vt)
+        S1 = sig.sum()
+        if abs(S1 - S) / S1 < tol:
+            break
+        S = S1
+    
+    return B * row_norms
+
+
+def perform_factor_analysis(items, group_indices):
     """
     Perform factor analysis on all groups.
     
     Args:
-        groups: List of DataFrames for each group
+        items: Question answers of all rows (from prepare_format_groups)
+        group_indices: List of row index arrays for each group
         
     Returns:
         tuple: (loadings, eigenvalues)
     """
     print(f"\n{COLOR_CYAN}Performing factor analysis...{COLOR_RESET}")
     
+    # Correlation matrices of the complete cases of every group, stacked
+    # for a single batched eigendecomposition
+    corr = np.empty((len(group_indices), len(QUESTION_COLS), len(QUESTION_COLS)))
+    for i, idx in enumerate(group_indices):
+        X = items[idx]
+        X = X[~np.isnan(X).any(axis=1)]
+        corr[i] = np.corrcoef(X, rowvar=False)
+    
+    unrotated, all_eigenvalues = principal_components(corr, NUM_FACTORS)
+    
     loadings = []
     eigenvalues = []
     
-    for i, group in enumerate(groups):
+    for i, ev in enumerate(all_eigenvalues):
         print(f"  Analyzing Group {i + 1} ({GROUP_LABELS[i]})...")
         
-        fa = FactorAnalyzer(
-            rotation='varimax',
-            method='principal',
-            impute='drop',
-            n_factors=NUM_FACTORS
-        )
-        fa.fit(group)
+        rotated = varimax_bsv(unrotated[i])
         
-        loadings.append(fa.loadings_)
-        ev, _ = fa.get_eigenvalues()
+        # Orient each factor so that its loadings sum to a positive value
+        signs = np.sign(rotated.sum(axis=0))
+        signs[signs == 0] = 1
+        
+        loadings.append(rotated * signs)
         eigenvalues.append(ev)
         
         print(f"    Eigenvalues (first 3): {ev[:3]}")
@@ -214,20 +385,19 @@ def perform_factor_analysis(groups):
     return loadings, eigenvalues
 
 
-def create_scree_plot(eigenvalues, groups):
+def create_scree_plot(eigenvalues):
     """
     Create and display scree plot for all groups.
     
     Args:
         eigenvalues: List of eigenvalue arrays
-        groups: List of DataFrames for determining number of factors
     """
     print(f"\n{COLOR_CYAN}Creating scree plot...{COLOR_RESET}")
     
     plt.figure(figsize=(10, 6))
     
-    for i, (ev, group) in enumerate(zip(eigenvalues, groups)):
-        num_factors = group.shape[1]
+    for i, ev in enumerate(eigenvalues):
+        num_factors = len(ev)
         plt.plot(range(1, num_factors + 1), ev, '-o', label=GROUP_LABELS[i])
     
     plt.title('Scree Plot - Eigenvalues by Factor', fontsize=14, fontweight='bold')
@@ -250,25 +420,15 @@ def save_loadings_to_csv(loadings, group_index):
     """
     print(f"\n{COLOR_CYAN}Saving factor loadings to CSV...{COLOR_RESET}")
     
-    # Round to 2 decimals and convert to string
-    loadings_formatted = np.round(loadings, 2).astype(str)
-    
-    # Insert question names as first column
-    loadings_formatted = np.insert(
-        loadings_formatted, 0, QUESTION_COLS, axis=1
-    )
-    
-    # Insert header row
-    header = [""] + [f"F{i+1}" for i in range(NUM_FACTORS)]
-    loadings_formatted = np.insert(
-        loadings_formatted, 0, header, axis=0
+    loadings_df = pd.DataFrame(
+        loadings,
+        index=QUESTION_COLS,
+        columns=[f"F{i+1}" for i in range(NUM_FACTORS)]
     )
     
-    # Save to CSV
+    # Save to CSV, rounded to 2 decimals
     output_path = OUTPUT_FILEPATH.format(group_index)
-    with open(output_path, "w+", newline='') as csv_file:
-        csv_writer = csv.writer(csv_file, delimiter=',')
-        csv_writer.writerows(loadings_formatted)
+    loadings_df.to_csv(output_path, float_format="%.2f")
     
     print(f"Factor loadings saved to: {output_path}")
 
@@ -288,26 +448,7 @@ def create_loadings_heatmaps(loadings):
     factor_labels = [f"F{i+1}" for i in range(NUM_FACTORS)]
     
     for i, (loading, ax) in enumerate(zip(loadings, axes)):
-        # Create DataFrame for heatmap
-        loading_df = pd.DataFrame(
-            np.round(loading, 2),
-            index=QUESTION_COLS,
-            columns=factor_labels
-        )
-        
-        # Create heatmap
-        sns.heatmap(
-            loading_df,
-            ax=ax,
-            cmap='RdBu_r',
-            center=0,
-            vmin=-1,
-            vmax=1,
-            annot=True,
-            fmt='.2f',
-            square=False,
-            cbar_kws={"shrink": 0.8}
-        )
+        draw_heatmap(ax, np.round(loading, 2), QUESTION_COLS, factor_labels)
         
         ax.set_title(GROUP_LABELS[i], fontsize=12, fontweight='bold')
         ax.set_xlabel('Factors', fontsize=10)
@@ -356,8 +497,8 @@ def main():
     print("factor structures across different questionnaire formats.")
     
     # Load data
-    print(f"\nLoading data from '{DATA_FILEPATH}'...")
-    matrix = pd.read_csv(DATA_FILEPATH)
+    print(f"\nLoading data from '{MATRIX_CSV}'...")
+    matrix = load_matrix(columns=INPUT_COLS)
     print(f"Data loaded: {len(matrix)} records")
     
     # Filter data
@@ -366,10 +507,10 @@ def main():
         return
     
     # Prepare format groups
-    groups = prepare_format_groups(filtered_matrix)
+    items, group_indices = prepare_format_groups(filtered_matrix)
     
     # Check if any group is empty
-    if any(len(group) == 0 for group in groups):
+    if any(len(idx) == 0 for idx in group_indices):
         print(f"{COLOR_RED}Error: One or more groups have no data.{COLOR_RESET}")
         return
     
@@ -377,19 +518,17 @@ def main():
     chi_square, p_value, kmo_model = perform_adequacy_tests(filtered_matrix)
     
     # Perform factor analysis
-    loadings, eigenvalues = perform_factor_analysis(groups)
+    loadings, eigenvalues = perform_factor_analysis(items, group_indices)
     
     # Create scree plot
-    create_scree_plot(eigenvalues, groups)
+    create_scree_plot(eigenvalues)
     
     # Create factor loadings heatmaps
     create_loadings_heatmaps(loadings)
     
     # Save loadings for all groups to CSV
-    save_loadings_to_csv(loadings[0], 0)
-    save_loadings_to_csv(loadings[1], 1)
-    save_loadings_to_csv(loadings[2], 2)
-    save_loadings_to_csv(loadings[3], 3)
+    for i, group_loadings in enumerate(loadings):
+        save_loadings_to_csv(group_loadings, i)
     
     # Print summary
     print_summary(chi_square, p_value, kmo_model, eigenvalues)
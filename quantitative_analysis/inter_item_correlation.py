@@ -4,9 +4,16 @@ Inter-item correlation (IAK) analysis.
 This module calculates inter-item correlations for g01-g13 items.
 """
 
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
+
+# Imported from the package, or run directly as a script
+if __package__:
+    from quantitative_analysis.data_io import filter_frequent_students, load_matrix
+    from quantitative_analysis.plotting import draw_heatmap
+else:
+    from data_io import filter_frequent_students, load_matrix
+    from plotting import draw_heatmap
 
 vars = ['g01', 'g02', 'g03', 'g04', 'g05', 'g06', 'g07', 'g08', 
             'g09', 'g10', 'g11', 'g12', 'g13']
@@ -14,54 +21,94 @@ vars = ['g01', 'g02', 'g03', 'g04', 'g05', 'g06', 'g07', 'g08',
 
 def filter_data(matrix):
     """Filter for students who regularly visit."""
-    matrix = matrix[matrix['uloga'] == 2]  # Only students
-    matrix = matrix[matrix['cesto'] > 1]   # Only those who regularly visit the website
+    matrix = filter_frequent_students(matrix)
     # Filter rows where at least 5 fields from g01-g13 have values
     matrix = matrix[matrix[vars].notna().sum(axis=1) >= 6]
     return matrix
 
+
+def pairwise_corr(X):
+    """
+    Pearson correlation matrix using pairwise-complete observations.
+    
+    Same result as DataFrame.corr(), but every per-pair sum is taken from
+    a matrix product over the missing-value mask instead of looping over
+    the column pairs.
+    
+    Args:
+        X: 2D float array (observations x items), NaN for missing
+        
+    Returns:
+        np.ndarray: Correlation matrix (items x items)
+    """
+    mask = ~np.isnan(X)
+    M = mask.astype(np.float64)
+    # Centering on the column means does not change r, but keeps the
+    # sums below small
+    Xc = np.where(mask, X - np.nanmean(X, axis=0), 0.0)
+    
+    n = M.T @ M                     # n[i, j]: rows where i and j both present
+    s = Xc.T @ M                    # s[i, j]: sum of x_i over those rows
+    ss = (Xc * Xc).T @ M            # ss[i, j]: sum of x_i^2 over those rows
+    sxy = Xc.T @ Xc
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - s * s.T / n
+        var = ss - s * s / n
+        return cov / np.sqrt(var * var.T)
+
+
 def calculate_iic(grid):
     """
     Calculate inter-item correlations for all items.
     
     Returns:
-        pd.DataFrame: Correlation matrix
+        tuple: (correlations, labels) with the correlation matrix rounded
+            to 2 decimals as a float32 array and the item labels
     """
     print("\n" + "="*70)
     print("Inter-item Correlation (IAK)")
     print("="*70)
     
     # Calculate inter-item correlations
-    correlations = grid.corr().round(2)
-    mean_iic = correlations.mean().mean()
+    X = np.ascontiguousarray(grid.to_numpy(dtype=np.float64))
+    correlations = pairwise_corr(X).round(2).astype(np.float32)
+    labels = list(grid.columns)
+    
+    # Mean of the item means, skipping undefined correlations
+    mean_iic = np.nanmean(np.nanmean(correlations, axis=0, dtype=np.float64))
     print(f"Mean IAC: {mean_iic:.2f}")
     
-    return correlations
+    return correlations, labels
+
+
+def save_iic_to_csv(correlations, labels, output_csv):
+    """
+    Save the rounded correlation matrix to CSV with item labels.
+    
+    Args:
+        correlations: Correlation matrix from calculate_iic
+        labels: Item labels for the rows and columns
+        output_csv: Output file path
+    """
+    rows = np.column_stack([labels, np.char.mod("%.2f", correlations)])
+    np.savetxt(output_csv, rows, fmt="%s", delimiter=",",
+               header=",".join([""] + labels), comments="")
 
 
-def create_iac_heatmap(correlations):
+def create_iac_heatmap(correlations, labels):
     """
     Create heatmap visualization for inter-item correlations.
     
     Args:
-        correlations: DataFrame with correlation matrix
+        correlations: Correlation matrix from calculate_iic
+        labels: Item labels for the rows and columns
     """
     print("\nCreating inter-item correlation heatmap...")
     
-    plt.figure(figsize=(12, 10))
-    
-    sns.heatmap(
-        correlations,
-        cmap='RdBu_r',
-        center=0,
-        vmin=-1,
-        vmax=1,
-        annot=True,
-        fmt='.2f',
-        square=True,
-        cbar_kws={"shrink": 0.8},
-        linewidths=0.5
-    )
+    _, ax = plt.subplots(figsize=(12, 10))
+    
+    draw_heatmap(ax, correlations, labels, labels, square=True)
     
     plt.title('Inter-item Correlation Matrix (g01-g13)', fontsize=14, fontweight='bold')
     plt.tight_layout()
@@ -76,7 +123,7 @@ def main():
     
     # Load data
     print("\nLoading data from 'data/input/matrix-final.csv'...")
-    matrix = pd.read_csv("data/input/matrix-final.csv")
+    matrix = load_matrix(columns=['uloga', 'cesto'] + vars)
     print(f"Data loaded: {len(matrix)} records")
     
     # Filter data
@@ -86,14 +133,14 @@ def main():
     grid = filtered_matrix[vars]
     
     # Calculate inter-item correlations
-    correlations = calculate_iic(grid)
+    correlations, labels = calculate_iic(grid)
     
     # Create heatmap visualization
-    create_iac_heatmap(correlations)
+    create_iac_heatmap(correlations, labels)
     
     # Save correlation matrix to CSV
     output_csv = "data/output/iic_all_formats.csv"
-    correlations.to_csv(output_csv)
+    save_iic_to_csv(correlations, labels, output_csv)
     print(f"\nInter-item correlation matrix saved to {output_csv}")
     
     print("\n" + "="*70)
@@ -0,0 +1,43 @@
+"""
+Shared plotting helpers.
+
+Heatmaps of small correlation/loading matrices are drawn directly with
+Matplotlib's imshow, with one text annotation per cell.
+"""
+
+import numpy as np
+
+
+def draw_heatmap(ax, values, row_labels, col_labels, square=False):
+    """
+    Draw an annotated heatmap on a fixed [-1, 1] diverging color scale.
+
+    Args:
+        ax: Matplotlib axes to draw on
+        values: 2D array of values to show
+        row_labels: Labels for the rows (y axis)
+        col_labels: Labels for the columns (x axis)
+        square: Draw square cells instead of filling the axes
+
+    Returns:
+        AxesImage: The drawn image
+    """
+    values = np.asarray(values)
+    im = ax.imshow(values, cmap='RdBu_r', vmin=-1, vmax=1,
+                   aspect='equal' if square else 'auto')
+
+    # Light text on the saturated ends of the color scale; undefined
+    # (NaN) cells are left blank
+    for (i, j), value in np.ndenumerate(values):
+        if not np.isfinite(value):
+            continue
+        ax.text(j, i, f"{value:.2f}", ha='center', va='center',
+                color='white' if abs(value) > 0.6 else 'black')
+
+    ax.set_xticks(range(values.shape[1]))
+    ax.set_xticklabels(col_labels)
+    ax.set_yticks(range(values.shape[0]))
+    ax.set_yticklabels(row_labels)
+    ax.figure.colorbar(im, ax=ax, shrink=0.8)
+
+    return im
@@ -8,23 +8,66 @@ chi-square, and SEM analysis.
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import matplotlib.pyplot as plt
 import statsmodels.api as sm
 from statsmodels.formula.api import ols
 from statsmodels.graphics.factorplots import interaction_plot
 from scipy.stats import mannwhitneyu, ttest_ind, chi2_contingency
-from semopy import Model, Optimizer, gather_statistics
+from semopy import Model, calc_stats
 
-def classify_text_box_size(hidden_value):
-    """Classify text box size based on hidden value.
+# Imported from the package, or run directly as a script
+if __package__:
+    from quantitative_analysis.data_io import ITEM_COLS, load_matrix
+else:
+    from data_io import ITEM_COLS, load_matrix
+
+def classify_text_box_size(hidden_values):
+    """Classify text box size based on hidden values.
+    
+    Args:
+        hidden_values: Array of hidden field values from survey
+        
+    Returns:
+        Array with 1 for smaller box (hidden < 51), 2 for larger box (hidden >= 51)
+    """
+    return np.where(np.asarray(hidden_values) < 51, np.uint8(1), np.uint8(2))
+
+
+def text_length(series):
+    """Calculate the length of each text answer in a column.
+    
+    Lengths are computed by Arrow on the string buffer, without creating
+    Python string objects. Missing answers have length 0 (converting them
+    with astype(str) would give len('nan') == 3, which is also below the
+    10 character threshold).
     
     Args:
-        hidden_value: Hidden field value from survey
+        series: Text column (string[pyarrow] when loaded via load_matrix)
         
     Returns:
-        1 for smaller box (hidden < 51), 2 for larger box (hidden >= 51)
+        int32 array of answer lengths
     """
-    return 1 if hidden_value < 51 else 2
+    arrow_array = pa.array(series.astype('string[pyarrow]').array)
+    return pc.fill_null(pc.utf8_length(arrow_array), 0).to_numpy(
+        zero_copy_only=False
+    )
+
+
+def max_text_length(df, columns):
+    """Calculate the row-wise maximum text length over several columns.
+    
+    Args:
+        df: DataFrame with survey responses
+        columns: Text columns to compare
+        
+    Returns:
+        Array with the length of the longest answer in each row
+        (0 for rows with no answer)
+    """
+    lengths = np.stack([text_length(df[col]) for col in columns], axis=1)
+    return lengths.max(axis=1)
 
 
 def calculate_response_lengths(df):
@@ -36,35 +79,13 @@ def calculate_response_lengths(df):
     Returns:
         DataFrame with added response length columns
     """
-    # Initialize length columns
-    df['duzodg'] = 0
-    df['duzodgm'] = 0
-    df['duzodgv'] = 0
-    
-    # Convert text columns to strings
-    txt_columns = ['txt01', 'txt02', 'txt03', 'txt01mali', 'txt02mali', 'txt03mali']
-    for col in txt_columns:
-        df[col] = df[col].astype(str)
-    
-    # Calculate maximum length for large and small text boxes
-    df['duzodgv'] = np.maximum(
-        df['txt01'].str.len(),
-        np.maximum(df['txt02'].str.len(), df['txt03'].str.len())
-    )
-    
-    df['duzodgm'] = np.maximum(
-        df['txt01mali'].str.len(),
-        np.maximum(df['txt02mali'].str.len(), df['txt03mali'].str.len())
-    )
-    
-    # Set length to 0 if less than threshold (10 characters)
+    # Maximum length for large and small text boxes, set to 0 if less
+    # than threshold (10 characters)
     min_length_threshold = 10
-    df['duzodgv'] = df['duzodgv'].apply(
-        lambda x: 0 if x < min_length_threshold else x
-    )
-    df['duzodgm'] = df['duzodgm'].apply(
-        lambda x: 0 if x < min_length_threshold else x
-    )
+    large_lengths = max_text_length(df, ['txt01', 'txt02', 'txt03'])
+    small_lengths = max_text_length(df, ['txt01mali', 'txt02mali', 'txt03mali'])
+    df['duzodgv'] = np.where(large_lengths < min_length_threshold, 0, large_lengths)
+    df['duzodgm'] = np.where(small_lengths < min_length_threshold, 0, small_lengths)
     
     # Total response length
     df['duzodg'] = df['duzodgv'] + df['duzodgm']
@@ -82,10 +103,13 @@ def add_response_flags(df):
         DataFrame with added flag columns
     """
     # Flag: answered at least one text box
-    df['imaot'] = df['duzodg'].apply(lambda x: 1 if x > 0 else 0)
+    df['imaot'] = (df['duzodg'].to_numpy() > 0).astype(np.uint8)
     
-    # Flag: answered all grid questions (validity check)
-    df['imasve'] = df.iloc[:, 7:20].sum(axis=1, min_count=13)
+    # Flag: answered all grid questions (validity check); the grid total,
+    # or NaN if any of g01-g13 is missing
+    block = df[ITEM_COLS].to_numpy(dtype=np.float32)
+    valid = (~np.isnan(block)).sum(axis=1) == len(ITEM_COLS)
+    df['imasve'] = np.where(valid, np.nansum(block, axis=1), np.nan)
     
     return df
 
@@ -100,13 +124,16 @@ def filter_valid_responses(df, min_response_length=30):
     Returns:
         Filtered DataFrame with valid responses only
     """
-    # Filter for complete grid responses and valid time
-    filtered = df[(~df['imasve'].isna()) & (df['vreme'] > 1)].copy()
-    
-    # Further filter by minimum response length
-    filtered = filtered[filtered['duzodg'] > min_response_length]
+    # Complete grid responses, valid time and minimum response length,
+    # combined into a single mask
+    mask = (
+        ~np.isnan(df['imasve'].to_numpy()) &
+        (df['vreme'].to_numpy() > 1) &
+        (df['duzodg'].to_numpy() > min_response_length)
+    )
     
-    return filtered
+    # Copy, since callers add label columns to the result
+    return df.loc[mask].copy()
 
 
 def create_format_labels(df):
@@ -177,11 +204,13 @@ def calculate_mean_by_format(df):
     print("Mean Response Lengths by Format")
     print("="*50)
     
-    form1_mean = df[(df['formatUp'] == 1) & (df['duzodg'] > 0)]['duzodg'].mean()
-    form2_mean = df[(df['formatUp'] == 2) & (df['duzodg'] > 0)]['duzodg'].mean()
+    # Both format means from a single mask and groupby
+    means = (df.loc[df['duzodg'] > 0, ['formatUp', 'duzodg']]
+               .groupby('formatUp', sort=False, observed=True)['duzodg']
+               .mean())
     
-    print(f"Format 1 (Jedna strana): {form1_mean:.2f}")
-    print(f"Format 2 (Slajdovi): {form2_mean:.2f}")
+    print(f"Format 1 (Jedna strana): {means.get(1, np.nan):.2f}")
+    print(f"Format 2 (Slajdovi): {means.get(2, np.nan):.2f}")
 
 
 def perform_mann_whitney_test(form1, form2):
@@ -265,17 +294,14 @@ def perform_sem_analysis(df):
     '''
     
     model = Model(model_spec)
-    model.load_dataset(faktor)
-    
-    opt = Optimizer(model)
-    ofv = opt.optimize()
-    stats = gather_statistics(opt)
+    model.fit(faktor, obj='MLW', solver='SLSQP')
+    stats = calc_stats(model)
     
     print("\nModel Statistics:")
-    print(stats)
+    print(stats.T)
     
-    if 'rmsea' in stats:
-        print(f"\nRMSEA: {stats['rmsea']:.4f}")
+    if 'RMSEA' in stats.columns:
+        print(f"\nRMSEA: {stats['RMSEA'].iloc[0]:.4f}")
 
 
 def main():
@@ -287,11 +313,11 @@ def main():
     
     # Load data
     print("\nLoading data from 'data/input/matrix-final.csv'...")
-    matrix = pd.read_csv("../data/input/matrix-final.csv")
+    matrix = load_matrix()
     print(f"Data loaded: {len(matrix)} records")
     
     # Classify text box sizes
-    matrix['dugi'] = matrix['hidden'].apply(classify_text_box_size)
+    matrix['dugi'] = classify_text_box_size(matrix['hidden'].to_numpy())
     
     # # Calculate response lengths
     matrix = calculate_response_lengths(matrix)